@@ -0,0 +1,111 @@
+"""
+Servidor local para capturar el callback OAuth de Strava
+
+Separado de strava_client para no cargar http.server al importar el cliente.
+"""
+
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+class AuthCallbackHandler(BaseHTTPRequestHandler):
+    """Handler para capturar el callback de OAuth"""
+    
+    authorization_code = None
+    
+    # Respuestas fijas, codificadas una sola vez al importar el módulo
+    SUCCESS_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Autenticacion Exitosa</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            height: 100vh;
+            margin: 0;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+        }
+        .container {
+            text-align: center;
+            padding: 40px;
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 10px;
+            backdrop-filter: blur(10px);
+        }
+        h1 { margin: 0 0 20px 0; font-size: 2.5em; }
+        p { font-size: 1.2em; margin: 10px 0; }
+        .checkmark { font-size: 4em; margin-bottom: 20px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="checkmark">&#10003;</div>
+        <h1>Autenticacion Completada!</h1>
+        <p>Ya puedes cerrar esta ventana</p>
+        <p>Vuelve a la terminal para continuar</p>
+    </div>
+</body>
+</html>""".encode('utf-8')
+    SUCCESS_LENGTH = str(len(SUCCESS_HTML))
+    
+    ERROR_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Error</title>
+</head>
+<body>
+    <h1>Error: No se recibio el codigo de autorizacion</h1>
+    <p>Por favor, intenta de nuevo.</p>
+</body>
+</html>""".encode('utf-8')
+    ERROR_LENGTH = str(len(ERROR_HTML))
+    
+    SERVER_ERROR_TEXT = b"Error procesando la solicitud"
+    SERVER_ERROR_LENGTH = str(len(SERVER_ERROR_TEXT))
+    
+    def do_GET(self):
+        try:
+            print(f"\n📥 Solicitud recibida: {self.path}")
+            query_components = parse_qs(urlparse(self.path).query)
+            
+            if 'code' in query_components:
+                AuthCallbackHandler.authorization_code = query_components['code'][0]
+                
+                # Enviar respuesta HTTP correctamente formada
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', self.SUCCESS_LENGTH)
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(self.SUCCESS_HTML)
+                
+                print("\n✓ Código de autorización recibido")
+            else:
+                # Error: no se recibió código
+                self.send_response(400)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', self.ERROR_LENGTH)
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(self.ERROR_HTML)
+        except Exception as e:
+            print(f"\n⚠ Error procesando callback: {e}")
+            try:
+                self.send_response(500)
+                self.send_header('Content-Type', 'text/plain')
+                self.send_header('Content-Length', self.SERVER_ERROR_LENGTH)
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(self.SERVER_ERROR_TEXT)
+            except:
+                pass
+    
+    def log_message(self, format, *args):
+        # Silenciar logs del servidor
+        pass
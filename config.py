@@ -5,26 +5,58 @@ IDs y secretos se cargan desde .env o .env.dev (no se suben a GitHub).
 
 import os
 from pathlib import Path
+from typing import Dict
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
 # Cargar .env o .env.dev desde la raíz del proyecto
 _root = Path(__file__).resolve().parent
-load_dotenv(_root / ".env")
-load_dotenv(_root / ".env.dev")
+_ENV: Dict[str, str] = {}
 
-# Credenciales de Strava API (desde variables de entorno)
-# Obtén estas credenciales en: https://www.strava.com/settings/api
-STRAVA_CLIENT_ID = os.getenv("STRAVA_CLIENT_ID", "")
-STRAVA_CLIENT_SECRET = os.getenv("STRAVA_CLIENT_SECRET", "")
-STRAVA_REDIRECT_URI = os.getenv("STRAVA_REDIRECT_URI", "http://localhost:8000/authorized")
 
-# Credenciales de Claude API (desde variables de entorno)
-# Obtén tu API key en: https://console.anthropic.com/
-CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY", "")
+def refresh_env_cache() -> Dict[str, str]:
+    """
+    Vuelve a leer .env, .env.dev y el entorno del proceso.
+    
+    Los archivos se parsean una sola vez a un dict (sin modificar os.environ).
+    Prioridad: variables de entorno > .env > .env.dev
+    
+    Solo reasigna las variables globales de este módulo (STRAVA_CLIENT_ID, etc.):
+    los nombres ya importados con `from config import ...` conservan el valor
+    anterior. Tras llamarla, lee las credenciales como `config.STRAVA_CLIENT_ID`
+    o desde el dict devuelto.
+    
+    Returns:
+        Dict con todas las variables cargadas
+    """
+    global _ENV, STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET, STRAVA_REDIRECT_URI, CLAUDE_API_KEY
+    
+    env: Dict[str, str] = {}
+    for env_file in (_root / ".env.dev", _root / ".env"):
+        env.update({k: v for k, v in dotenv_values(env_file).items() if v is not None})
+    env.update(os.environ)
+    _ENV = env
+    
+    # Credenciales de Strava API (desde variables de entorno)
+    # Obtén estas credenciales en: https://www.strava.com/settings/api
+    STRAVA_CLIENT_ID = _ENV.get("STRAVA_CLIENT_ID", "")
+    STRAVA_CLIENT_SECRET = _ENV.get("STRAVA_CLIENT_SECRET", "")
+    STRAVA_REDIRECT_URI = _ENV.get("STRAVA_REDIRECT_URI", "http://localhost:8000/authorized")
+    
+    # Credenciales de Claude API (desde variables de entorno)
+    # Obtén tu API key en: https://console.anthropic.com/
+    CLAUDE_API_KEY = _ENV.get("CLAUDE_API_KEY", "")
+    
+    return _ENV
+
+
+refresh_env_cache()
+
 
 # Configuración del agente
-COACH_SYSTEM_PROMPT = """Eres un coach experto de running con certificación IAAF nivel 3. 
+def coach_system_prompt() -> str:
+    """System prompt del coach (solo se usa al crear un RunningCoach)"""
+    return """Eres un coach experto de running con certificación IAAF nivel 3. 
 
 Tu especialidad es analizar datos de entrenamiento y proporcionar consejos personalizados considerando:
 
@@ -42,6 +74,14 @@ Tu especialidad es analizar datos de entrenamiento y proporcionar consejos perso
 Siempre proporciona consejos basados en evidencia científica y datos concretos del atleta.
 Sé directo, motivador pero realista."""
 
+
+def __getattr__(name: str):
+    """Compatibilidad con `from config import COACH_SYSTEM_PROMPT` (PEP 562)"""
+    if name == "COACH_SYSTEM_PROMPT":
+        return coach_system_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Configuración de análisis
 WEEKS_TO_ANALYZE = 4  # Semanas de histórico a analizar por defecto
 MIN_ACTIVITIES_FOR_ANALYSIS = 3  # Mínimo de actividades para dar recomendaciones
@@ -10,13 +10,19 @@ from config import (
     STRAVA_CLIENT_SECRET,
     STRAVA_REDIRECT_URI,
     CLAUDE_API_KEY,
-    COACH_SYSTEM_PROMPT
+    coach_system_prompt
 )
 from strava_client import authenticate_strava, StravaClient
 from training_analyzer import TrainingAnalyzer
 from running_coach import RunningCoach, CoachTools
 
 
+def _load_recent_activities(client: StravaClient, weeks: int = 4):
+    """Obtiene las actividades de las últimas `weeks` semanas"""
+    after_date = datetime.now() - timedelta(weeks=weeks)
+    return client.get_activities(after=after_date)
+
+
 def example_basic_usage():
     """Ejemplo básico de uso del agente"""
     
@@ -31,14 +37,13 @@ def example_basic_usage():
     client = StravaClient(auth)
     
     # 2. Obtener actividades
-    after_date = datetime.now() - timedelta(weeks=4)
-    activities = client.get_activities(after=after_date)
+    activities = _load_recent_activities(client)
     
     # 3. Analizar datos
     analyzer = TrainingAnalyzer(activities)
     
     # 4. Crear coach
-    coach = RunningCoach(CLAUDE_API_KEY, COACH_SYSTEM_PROMPT)
+    coach = RunningCoach(CLAUDE_API_KEY, coach_system_prompt())
     coach.set_training_context(analyzer)
     
     # 5. Obtener análisis
@@ -54,9 +59,9 @@ def example_specific_questions():
     # Setup inicial
     auth = authenticate_strava(STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET, STRAVA_REDIRECT_URI)
     client = StravaClient(auth)
-    activities = client.get_activities(after=datetime.now() - timedelta(weeks=4))
+    activities = _load_recent_activities(client)
     analyzer = TrainingAnalyzer(activities)
-    coach = RunningCoach(CLAUDE_API_KEY, COACH_SYSTEM_PROMPT)
+    coach = RunningCoach(CLAUDE_API_KEY, coach_system_prompt())
     coach.set_training_context(analyzer)
     
     # Hacer diferentes preguntas
@@ -105,13 +110,13 @@ def example_race_prediction():
         (42.195, "Maratón")
     ]
     
-    for distance_km, name in distances:
-        estimated_time = CoachTools.estimate_race_time(
-            distance_km=distance_km,
-            reference_distance_km=5,
-            reference_time_minutes=recent_5k_minutes
-        )
-        
+    estimated_times = CoachTools.estimate_race_times(
+        [distance_km for distance_km, _ in distances],
+        reference_distance_km=5,
+        reference_time_minutes=recent_5k_minutes
+    )
+    
+    for (distance_km, name), estimated_time in zip(distances, estimated_times):
         hours = int(estimated_time // 60)
         minutes = int(estimated_time % 60)
         
@@ -131,7 +136,7 @@ def example_programmatic_analysis():
     # Setup
     auth = authenticate_strava(STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET, STRAVA_REDIRECT_URI)
     client = StravaClient(auth)
-    activities = client.get_activities(after=datetime.now() - timedelta(weeks=4))
+    activities = _load_recent_activities(client)
     analyzer = TrainingAnalyzer(activities)
     
     # Obtener métricas específicas
@@ -167,7 +172,7 @@ def example_full_workflow():
     
     # 2. Cargar datos
     print("\n2. Cargando actividades...")
-    activities = client.get_activities(after=datetime.now() - timedelta(weeks=6))
+    activities = _load_recent_activities(client, weeks=6)
     print(f"   Actividades cargadas: {len(activities)}")
     
     # 3. Analizar
@@ -179,7 +184,7 @@ def example_full_workflow():
     
     # 4. Crear coach
     print("\n4. Inicializando coach...")
-    coach = RunningCoach(CLAUDE_API_KEY, COACH_SYSTEM_PROMPT)
+    coach = RunningCoach(CLAUDE_API_KEY, coach_system_prompt())
     coach.set_training_context(analyzer)
     
     # 5. Obtener recomendaciones
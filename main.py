@@ -5,13 +5,14 @@ Coach de running personal powered by Strava + Claude
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from config import (
     STRAVA_CLIENT_ID,
     STRAVA_CLIENT_SECRET, 
     STRAVA_REDIRECT_URI,
     CLAUDE_API_KEY,
-    COACH_SYSTEM_PROMPT,
+    coach_system_prompt,
     WEEKS_TO_ANALYZE
 )
 from strava_client import (
@@ -25,9 +26,49 @@ from training_analyzer import TrainingAnalyzer
 from running_coach import RunningCoach, CoachTools
 
 
+# Textos fijos de la interfaz, construidos una sola vez
+BANNER_TEXT = (
+    "=" * 60 + "\n"
+    "🏃 RUNNING COACH AGENT\n"
+    "Powered by Strava + Claude\n"
+    + "=" * 60 + "\n"
+)
+
+MENU_TEXT = (
+    "\n" + "=" * 60 + "\n"
+    "MENÚ PRINCIPAL\n"
+    + "=" * 60 + "\n"
+    "1. Ver resumen de entrenamiento\n"
+    "2. Análisis completo del coach\n"
+    "3. Predecir tiempo de carrera\n"
+    "4. Sugerir entrenamiento\n"
+    "5. Consejos de prevención de lesiones\n"
+    "6. Hacer pregunta al coach\n"
+    "7. Calcular paces de entrenamiento\n"
+    "8. Ver estadísticas de Strava\n"
+    "9. Salir\n"
+    + "=" * 60 + "\n"
+)
+
+# Opciones de los submenús (se eligen por su número, empezando en 1)
+RACE_DISTANCES = ('5K', '10K', 'Media Maratón', 'Maratón')
+WORKOUT_TYPES = ('intervalos', 'tempo', 'carrera larga', 'recuperación', 'fartlek')
+
+
+def pick_option(options: tuple, choice: str, default: str) -> str:
+    """Devuelve la opción con el número elegido, o `default` si no es válido"""
+    if choice.isdecimal():
+        index = int(choice) - 1
+        if 0 <= index < len(options):
+            return options[index]
+    return default
+
+
 class RunningCoachApp:
     """Aplicación principal del coach de running"""
     
+    __slots__ = ('strava_client', 'coach', 'analyzer', 'athlete')
+    
     def __init__(self):
         self.strava_client = None
         self.coach = None
@@ -36,11 +77,27 @@ class RunningCoachApp:
     
     def initialize(self):
         """Inicializa la aplicación y se conecta a Strava y Claude"""
-        print("=" * 60)
-        print("🏃 RUNNING COACH AGENT")
-        print("Powered by Strava + Claude")
-        print("=" * 60)
+        sys.stdout.write(BANNER_TEXT)
         
+        # El coach se construye en segundo plano mientras se conecta con Strava
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            coach_future = executor.submit(RunningCoach, CLAUDE_API_KEY, coach_system_prompt())
+            
+            self._load_strava_data()
+            
+            # Inicializar coach con Claude
+            try:
+                print("\n🤖 Inicializando coach con Claude...")
+                self.coach = coach_future.result()
+                self.coach.set_training_context(self.analyzer)
+                print("✓ Coach listo para ayudarte\n")
+                
+            except Exception as e:
+                print(f"✗ Error al inicializar coach: {e}")
+                sys.exit(1)
+    
+    def _load_strava_data(self):
+        """Autentica con Strava, obtiene el atleta y carga las actividades recientes"""
         # Autenticar con Strava
         try:
             auth = authenticate_strava(
@@ -74,33 +131,10 @@ class RunningCoachApp:
         except Exception as e:
             print(f"✗ Error al cargar datos: {e}")
             sys.exit(1)
-        
-        # Inicializar coach con Claude
-        try:
-            print("\n🤖 Inicializando coach con Claude...")
-            self.coach = RunningCoach(CLAUDE_API_KEY, COACH_SYSTEM_PROMPT)
-            self.coach.set_training_context(self.analyzer)
-            print("✓ Coach listo para ayudarte\n")
-            
-        except Exception as e:
-            print(f"✗ Error al inicializar coach: {e}")
-            sys.exit(1)
     
     def show_menu(self):
         """Muestra el menú principal"""
-        print("\n" + "=" * 60)
-        print("MENÚ PRINCIPAL")
-        print("=" * 60)
-        print("1. Ver resumen de entrenamiento")
-        print("2. Análisis completo del coach")
-        print("3. Predecir tiempo de carrera")
-        print("4. Sugerir entrenamiento")
-        print("5. Consejos de prevención de lesiones")
-        print("6. Hacer pregunta al coach")
-        print("7. Calcular paces de entrenamiento")
-        print("8. Ver estadísticas de Strava")
-        print("9. Salir")
-        print("=" * 60)
+        sys.stdout.write(MENU_TEXT)
     
     def show_training_summary(self):
         """Muestra resumen de entrenamiento"""
@@ -108,7 +142,9 @@ class RunningCoachApp:
         print("📊 RESUMEN DE ENTRENAMIENTO")
         print("=" * 60)
         
-        summary = self.analyzer.get_summary_stats()
+        report = self.analyzer.get_training_report()
+        
+        summary = report['summary']
         print(f"\nÚltimas {summary['total_runs']} carreras:")
         print(f"  • Distancia total: {summary['total_distance_km']} km")
         print(f"  • Tiempo total: {summary['total_time_hours']} horas")
@@ -117,81 +153,74 @@ class RunningCoachApp:
         print(f"  • Desnivel total: {summary['total_elevation_gain_m']} m")
         
         print("\n📅 Kilometraje Semanal:")
-        weekly = self.analyzer.get_weekly_mileage()
-        for i, week in enumerate(weekly[:4], 1):
+        for i, week in enumerate(report['weekly'][:4], 1):
             print(f"  Semana {i} ({week['week_start']}): {week['distance_km']} km - {week['runs']} carreras")
         
         print("\n📈 Análisis de Carga:")
-        load = self.analyzer.analyze_training_load()
+        load = report['load']
         print(f"  • Cambio de volumen: {load['load_change_percent']}%")
         print(f"  • {load['recommendation']}")
         
         print("\n🎯 Distribución de Paces:")
-        pace_dist = self.analyzer.get_pace_distribution()
+        pace_dist = report['pace_distribution']
         if pace_dist:
             print(f"  • Promedio: {pace_dist['avg_pace']}")
             print(f"  • Más rápido: {pace_dist['fastest_pace']}")
             print(f"  • Más lento: {pace_dist['slowest_pace']}")
         
         print("\n⚠️  Problemas Detectados:")
-        issues = self.analyzer.detect_potential_issues()
-        for issue in issues:
+        for issue in report['issues']:
             print(f"  • {issue}")
     
+    @staticmethod
+    def _print_streamed(response):
+        """Imprime una respuesta del coach a medida que llega (Ctrl-C la interrumpe)"""
+        print()
+        try:
+            for chunk in response:
+                print(chunk, end="", flush=True)
+        except KeyboardInterrupt:
+            # Ctrl-C cancela solo la respuesta en curso, no la aplicación
+            response.close()
+            print("\n⏹  Respuesta interrumpida")
+        print()
+    
     def get_coach_analysis(self):
         """Obtiene análisis completo del coach"""
         print("\n🤖 Generando análisis del coach...")
         print("=" * 60)
         
-        analysis = self.coach.analyze_training()
-        print(f"\n{analysis}")
+        self._print_streamed(self.coach.analyze_training(stream=True))
     
     def predict_race(self):
         """Predice tiempo de carrera"""
         print("\n🏁 PREDICCIÓN DE CARRERA")
         print("=" * 60)
         
-        distances = {
-            '1': '5K',
-            '2': '10K',
-            '3': 'Media Maratón',
-            '4': 'Maratón'
-        }
-        
         print("\nSelecciona la distancia:")
-        for key, dist in distances.items():
+        for key, dist in enumerate(RACE_DISTANCES, 1):
             print(f"{key}. {dist}")
         
         choice = input("\nOpción: ").strip()
-        distance = distances.get(choice, '10K')
+        distance = pick_option(RACE_DISTANCES, choice, '10K')
         
         print(f"\n🤖 Analizando para {distance}...")
-        prediction = self.coach.predict_race_time(distance)
-        print(f"\n{prediction}")
+        self._print_streamed(self.coach.predict_race_time(distance, stream=True))
     
     def suggest_workout(self):
         """Sugiere un entrenamiento"""
         print("\n💪 SUGERENCIA DE ENTRENAMIENTO")
         print("=" * 60)
         
-        workout_types = {
-            '1': 'intervalos',
-            '2': 'tempo',
-            '3': 'carrera larga',
-            '4': 'recuperación',
-            '5': 'fartlek'
-        }
-        
         print("\nTipo de entrenamiento:")
-        for key, wtype in workout_types.items():
+        for key, wtype in enumerate(WORKOUT_TYPES, 1):
             print(f"{key}. {wtype.capitalize()}")
         
         choice = input("\nOpción: ").strip()
-        workout_type = workout_types.get(choice, 'general')
+        workout_type = pick_option(WORKOUT_TYPES, choice, 'general')
         
         print(f"\n🤖 Generando plan de {workout_type}...")
-        suggestion = self.coach.suggest_workout(workout_type)
-        print(f"\n{suggestion}")
+        self._print_streamed(self.coach.suggest_workout(workout_type, stream=True))
     
     def get_injury_prevention(self):
         """Obtiene consejos de prevención de lesiones"""
@@ -199,14 +228,13 @@ class RunningCoachApp:
         print("=" * 60)
         print("\n🤖 Generando recomendaciones...")
         
-        tips = self.coach.injury_prevention_tips()
-        print(f"\n{tips}")
+        self._print_streamed(self.coach.injury_prevention_tips(stream=True))
     
     def chat_with_coach(self):
         """Modo de chat libre con el coach"""
         print("\n💬 CHAT CON EL COACH")
         print("=" * 60)
-        print("Escribe 'salir' para volver al menú\n")
+        print("Escribe 'salir' para volver al menú (Ctrl-C interrumpe una respuesta)\n")
         
         while True:
             question = input("Tu pregunta: ").strip()
@@ -217,9 +245,9 @@ class RunningCoachApp:
             if not question:
                 continue
             
-            print("\n🤖 Coach:")
-            response = self.coach.ask(question)
-            print(f"{response}\n")
+            print("\n🤖 Coach:", end="")
+            self._print_streamed(self.coach.ask_stream(question))
+            print()
     
     def calculate_training_paces(self):
         """Calcula paces de entrenamiento"""
@@ -2,24 +2,131 @@
 Agente Coach de Running powered by Claude
 """
 
-import anthropic
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional, Sequence, Union
 from training_analyzer import TrainingAnalyzer
 
+if TYPE_CHECKING:
+    import anthropic
+
+
+# Clientes de Anthropic compartidos por API key para reutilizar las conexiones HTTP
+_ANTHROPIC_CLIENTS: Dict[str, "anthropic.Anthropic"] = {}
+
+
+def _get_anthropic_client(api_key: str) -> "anthropic.Anthropic":
+    """Devuelve el cliente compartido para la API key, creándolo la primera vez"""
+    client = _ANTHROPIC_CLIENTS.get(api_key)
+    if client is None:
+        # Import diferido: anthropic (con httpx y pydantic) tarda en importarse y
+        # las opciones del menú que no usan a Claude no deberían pagar ese coste
+        import anthropic
+        import httpx
+        
+        client = anthropic.Anthropic(
+            api_key=api_key,
+            max_retries=2,
+            timeout=60.0,
+            http_client=anthropic.DefaultHttpxClient(
+                limits=httpx.Limits(max_keepalive_connections=10)
+            )
+        )
+        _ANTHROPIC_CLIENTS[api_key] = client
+    return client
+
+
+# Multiplicadores de Jack Daniels sobre el pace base del 5K, por zona. Cada zona
+# es una cadena de factores aplicados en orden: plegarlos en un solo producto
+# redondea distinto en coma flotante y cambia el pace mostrado en algunos tiempos
+_PACE_MULTIPLIERS = (
+    ('easy', (1.25,)),  # 25% más lento
+    ('tempo', (1.08,)),  # 8% más lento
+    ('interval', (0.96,)),  # 4% más rápido
+    ('repetition', (0.90,)),  # 10% más rápido
+    ('long_run', (1.25, 1.05)),  # 5% más lento que el easy
+)
+
+# Exponente de fatiga de la fórmula de Riegel
+RIEGEL_FATIGUE_FACTOR = 1.06
+
+
+def _vdot(distance_km: float, time_minutes: float) -> float:
+    """Fórmula simplificada de VDOT sin redondear"""
+    # Convertir a velocidad en m/min
+    velocity_m_min = (distance_km * 1000) / time_minutes
+    
+    # VDOT ≈ -4.6 + 0.182258 * v + 0.000104 * v^2
+    return -4.6 + (0.182258 * velocity_m_min) + (0.000104 * velocity_m_min * velocity_m_min)
+
 
 class RunningCoach:
     """Agente de coach de running que usa Claude para análisis y consejos"""
     
+    __slots__ = (
+        'client',
+        'system_prompt',
+        'conversation_history',
+        'training_context',
+        'training_context_fp',
+        'model'
+    )
+    
     def __init__(self, api_key: str, system_prompt: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = _get_anthropic_client(api_key)
         self.system_prompt = system_prompt
         self.conversation_history: List[Dict] = []
         self.training_context: Optional[str] = None
+        self.training_context_fp: Optional[int] = None
         self.model = "claude-sonnet-4-20250514"
     
     def set_training_context(self, analyzer: TrainingAnalyzer):
         """Establece el contexto de entrenamiento desde el análisis de datos"""
+        # Mismas actividades que el contexto actual: no hace falta regenerarlo
+        if self.training_context is not None and self.training_context_fp == analyzer.fingerprint:
+            return
+        
         self.training_context = analyzer.generate_training_context()
+        self.training_context_fp = analyzer.fingerprint
+    
+    def _add_user_message(self, question: str, include_context: bool):
+        """Agrega la pregunta a la historia, con el contexto si es la primera"""
+        # Construir el mensaje del usuario
+        user_message = question
+        
+        # Si es la primera pregunta y hay contexto, incluirlo en un bloque aparte
+        # marcado como cacheable (prompt caching) para no reprocesarlo en cada turno
+        if include_context and self.training_context and len(self.conversation_history) == 0:
+            user_message = [
+                {
+                    "type": "text",
+                    "text": self.training_context,
+                    "cache_control": {"type": "ephemeral"}
+                },
+                {
+                    "type": "text",
+                    "text": f"---\n\nPregunta del atleta: {question}"
+                }
+            ]
+        
+        # Agregar mensaje a la historia
+        self.conversation_history.append({
+            "role": "user",
+            "content": user_message
+        })
+    
+    def _request_params(self) -> Dict:
+        """Parámetros comunes para las peticiones a Claude"""
+        return {
+            "model": self.model,
+            "max_tokens": 2000,
+            "system": [
+                {
+                    "type": "text",
+                    "text": self.system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ],
+            "messages": self.conversation_history
+        }
     
     def ask(self, question: str, include_context: bool = True) -> str:
         """
@@ -32,27 +139,11 @@ class RunningCoach:
         Returns:
             str: Respuesta del coach
         """
-        # Construir el mensaje del usuario
-        user_message = question
-        
-        # Si es la primera pregunta y hay contexto, incluirlo
-        if include_context and self.training_context and len(self.conversation_history) == 0:
-            user_message = f"{self.training_context}\n\n---\n\nPregunta del atleta: {question}"
-        
-        # Agregar mensaje a la historia
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self._add_user_message(question, include_context)
         
         # Hacer request a Claude
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                system=self.system_prompt,
-                messages=self.conversation_history
-            )
+            response = self.client.messages.create(**self._request_params())
             
             # Extraer respuesta
             assistant_message = response.content[0].text
@@ -68,10 +159,61 @@ class RunningCoach:
         except Exception as e:
             return f"Error al comunicarse con el coach: {str(e)}"
     
-    def analyze_training(self) -> str:
-        """Genera un análisis completo del entrenamiento actual"""
+    def ask_stream(self, question: str, include_context: bool = True) -> Iterator[str]:
+        """
+        Hace una pregunta al coach y entrega la respuesta a medida que se genera
+        
+        Args:
+            question: Pregunta del usuario
+            include_context: Si debe incluir el contexto de entrenamiento
+        
+        Si el generador se cierra antes de terminar (p. ej. con Ctrl-C), la
+        conexión se cierra y la pregunta se descarta de la historia.
+        
+        Yields:
+            str: Fragmentos de texto de la respuesta del coach
+        """
+        self._add_user_message(question, include_context)
+        
+        try:
+            with self.client.messages.stream(**self._request_params()) as stream:
+                for text in stream.text_stream:
+                    yield text
+                
+                assistant_message = stream.get_final_message().content[0].text
+        
+        except (GeneratorExit, KeyboardInterrupt):
+            # Respuesta cancelada por el usuario: descartar la pregunta sin respuesta
+            self.conversation_history.pop()
+            raise
+        
+        except Exception as e:
+            yield f"Error al comunicarse con el coach: {str(e)}"
+            return
+        
+        # Agregar respuesta completa a la historia
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": assistant_message
+        })
+    
+    def _ask_prompt(self, prompt: str, stream: bool) -> Union[str, Iterator[str]]:
+        """Envía un prompt predefinido con contexto, en streaming o esperando la respuesta completa"""
+        if stream:
+            return self.ask_stream(prompt, include_context=True)
+        return self.ask(prompt, include_context=True)
+    
+    def analyze_training(self, stream: bool = False) -> Union[str, Iterator[str]]:
+        """
+        Genera un análisis completo del entrenamiento actual
+        
+        Args:
+            stream: Si es True devuelve un iterador de fragmentos (ver ask_stream)
+        """
         if not self.training_context:
-            return "No hay datos de entrenamiento cargados."
+            message = "No hay datos de entrenamiento cargados."
+            # Generador (no iter de lista) para que admita close() como ask_stream
+            return (text for text in (message,)) if stream else message
         
         analysis_prompt = """Analiza los datos de entrenamiento proporcionados y genera un reporte completo que incluya:
 
@@ -83,10 +225,10 @@ class RunningCoach:
 
 Sé específico, usa los datos concretos y proporciona consejos accionables."""
         
-        return self.ask(analysis_prompt, include_context=True)
+        return self._ask_prompt(analysis_prompt, stream)
     
-    def predict_race_time(self, distance: str) -> str:
-        """Predice tiempo de carrera basado en entrenamientos"""
+    def predict_race_time(self, distance: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        """Predice tiempo de carrera basado en entrenamientos (stream: ver analyze_training)"""
         question = f"""Basándote en mis entrenamientos recientes, ¿qué tiempo podrías estimar para una carrera de {distance}? 
         
 Proporciona:
@@ -95,10 +237,10 @@ Proporciona:
 3. Pace objetivo recomendado
 4. Plan de carrera sugerido"""
         
-        return self.ask(question, include_context=True)
+        return self._ask_prompt(question, stream)
     
-    def suggest_workout(self, workout_type: str = "general") -> str:
-        """Sugiere un entrenamiento específico"""
+    def suggest_workout(self, workout_type: str = "general", stream: bool = False) -> Union[str, Iterator[str]]:
+        """Sugiere un entrenamiento específico (stream: ver analyze_training)"""
         question = f"""Sugiere un entrenamiento de tipo '{workout_type}' que sea apropiado para mi nivel actual.
         
 Incluye:
@@ -108,10 +250,10 @@ Incluye:
 4. Objetivo del entrenamiento
 5. Zonas de frecuencia cardíaca si es relevante"""
         
-        return self.ask(question, include_context=True)
+        return self._ask_prompt(question, stream)
     
-    def injury_prevention_tips(self) -> str:
-        """Proporciona consejos de prevención de lesiones"""
+    def injury_prevention_tips(self, stream: bool = False) -> Union[str, Iterator[str]]:
+        """Proporciona consejos de prevención de lesiones (stream: ver analyze_training)"""
         question = """Basándote en mi patrón de entrenamiento actual, ¿qué ejercicios de prevención de lesiones me recomiendas?
         
 Incluye:
@@ -120,7 +262,7 @@ Incluye:
 3. Frecuencia recomendada
 4. Áreas de riesgo según mi entrenamiento"""
         
-        return self.ask(question, include_context=True)
+        return self._ask_prompt(question, stream)
     
     def reset_conversation(self):
         """Reinicia la conversación manteniendo el contexto de entrenamiento"""
@@ -138,6 +280,8 @@ Incluye:
 class CoachTools:
     """Herramientas útiles para el coach"""
     
+    __slots__ = ()
+    
     @staticmethod
     def calculate_training_paces(recent_5k_time_minutes: float) -> Dict[str, str]:
         """
@@ -153,24 +297,15 @@ class CoachTools:
         # Pace base en segundos por km
         base_pace_sec = (recent_5k_time_minutes * 60) / 5
         
-        # Calcular paces para diferentes zonas (en segundos/km)
-        easy_pace = base_pace_sec * 1.25  # 25% más lento
-        tempo_pace = base_pace_sec * 1.08  # 8% más lento
-        interval_pace = base_pace_sec * 0.96  # 4% más rápido
-        repetition_pace = base_pace_sec * 0.90  # 10% más rápido
-        
-        def format_pace(sec_per_km):
-            minutes = int(sec_per_km // 60)
-            seconds = int(sec_per_km % 60)
-            return f"{minutes}:{seconds:02d} /km"
+        paces = {}
+        for zone, factors in _PACE_MULTIPLIERS:
+            pace_sec = base_pace_sec
+            for factor in factors:
+                pace_sec *= factor
+            minutes, seconds = divmod(int(pace_sec), 60)
+            paces[zone] = f"{minutes}:{seconds:02d} /km"
         
-        return {
-            'easy': format_pace(easy_pace),
-            'tempo': format_pace(tempo_pace),
-            'interval': format_pace(interval_pace),
-            'repetition': format_pace(repetition_pace),
-            'long_run': format_pace(easy_pace * 1.05)
-        }
+        return paces
     
     @staticmethod
     def estimate_race_time(distance_km: float, reference_distance_km: float, reference_time_minutes: float) -> float:
@@ -186,12 +321,33 @@ class CoachTools:
             Tiempo estimado en minutos
         """
         # Fórmula de Riegel: T2 = T1 * (D2/D1)^1.06
-        fatigue_factor = 1.06
-        time_ratio = (distance_km / reference_distance_km) ** fatigue_factor
+        time_ratio = (distance_km / reference_distance_km) ** RIEGEL_FATIGUE_FACTOR
         estimated_time = reference_time_minutes * time_ratio
         
         return estimated_time
     
+    @staticmethod
+    def estimate_race_times(
+        distances_km: Sequence[float],
+        reference_distance_km: float,
+        reference_time_minutes: float
+    ) -> List[float]:
+        """
+        Estima tiempos para varias distancias a partir de una misma referencia (Riegel)
+        
+        Args:
+            distances_km: Distancias objetivo
+            reference_distance_km: Distancia de referencia
+            reference_time_minutes: Tiempo en la distancia de referencia
+        
+        Returns:
+            Tiempos estimados en minutos, en el mismo orden que distances_km
+        """
+        return [
+            reference_time_minutes * (distance_km / reference_distance_km) ** RIEGEL_FATIGUE_FACTOR
+            for distance_km in distances_km
+        ]
+    
     @staticmethod
     def calculate_vdot(distance_km: float, time_minutes: float) -> float:
         """
@@ -205,11 +361,30 @@ class CoachTools:
         Returns:
             VDOT estimado
         """
-        # Convertir a velocidad en m/min
-        velocity_m_min = (distance_km * 1000) / time_minutes
+        return round(_vdot(distance_km, time_minutes), 1)
+    
+    @staticmethod
+    def calculate_vdot_batch(distances_km: Sequence[float], times_minutes: Sequence[float]) -> List[float]:
+        """
+        Calcula VDOT para varias carreras (p. ej. para evaluar muchos atletas de una vez)
+        
+        Args:
+            distances_km: Distancias de las carreras
+            times_minutes: Tiempos de las carreras, en el mismo orden
+        
+        Returns:
+            VDOT estimado de cada carrera
         
-        # Fórmula simplificada de VDOT
-        # VDOT ≈ -4.6 + 0.182258 * v + 0.000104 * v^2
-        vdot = -4.6 + (0.182258 * velocity_m_min) + (0.000104 * velocity_m_min ** 2)
+        Raises:
+            ValueError: Si las dos secuencias no tienen la misma longitud
+        """
+        if len(distances_km) != len(times_minutes):
+            raise ValueError(
+                f"distances_km ({len(distances_km)}) y times_minutes ({len(times_minutes)}) "
+                "deben tener la misma longitud"
+            )
         
-        return round(vdot, 1)
+        return [
+            round(_vdot(distance_km, time_minutes), 1)
+            for distance_km, time_minutes in zip(distances_km, times_minutes)
+        ]
@@ -3,23 +3,177 @@ Módulo para interactuar con la API de Strava
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import webbrowser
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
+from email.utils import formatdate
 import json
+import os
+from pathlib import Path
 import socket
+import tempfile
+import threading
 import time
 
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la librería estándar
+    orjson = None
+
+
+# Ubicación del token persistido y márgenes antes de su expiración:
+# con menos de TOKEN_EXPIRY_MARGIN_S el token ya no se usa (refresco inmediato);
+# dentro de SAFETY_WINDOW_S se sigue usando mientras se refresca en segundo plano
+TOKEN_CACHE_PATH = Path.home() / ".runningcoach" / "token.json"
+LEGACY_TOKEN_FILE = "strava_token.json"
+TOKEN_EXPIRY_MARGIN_S = 60
+SAFETY_WINDOW_S = 300
+TOKEN_REQUEST_TIMEOUT_S = 15
+
+# Caché local de actividades descargadas (evita repetir la descarga en cada arranque)
+ACTIVITY_CACHE_DIR = Path.home() / ".runningcoach" / "activities"
+ACTIVITY_CACHE_TTL_S = 15 * 60
+
+# Paginación de actividades: límite de seguridad, páginas pedidas en paralelo y
+# máximo de actividades por página que admite Strava
+MAX_ACTIVITY_PAGES = 10
+STRAVA_MAX_PER_PAGE = 200
+ACTIVITY_FETCH_WORKERS = 5
+
+# Límites de uso de Strava: ventanas de 15 minutos alineadas al reloj
+# (:00, :15, :30, :45); por encima de este uso se espera al reinicio de la ventana
+RATE_LIMIT_WINDOW_S = 15 * 60
+RATE_LIMIT_THRESHOLD = 0.9
+
+
+def _json_loads(data: bytes):
+    """Parsea JSON desde bytes (con orjson si está disponible)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serializa a JSON en bytes (con orjson si está disponible)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter cuyos sockets usan TCP_NODELAY y keep-alive de TCP"""
+    
+    # Las opciones por defecto de urllib3 ya incluyen TCP_NODELAY
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', self.SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    """Crea una sesión HTTP persistente (keep-alive) con reintentos ante errores transitorios"""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Devolver la última respuesta para que raise_for_status la procese
+    )
+    # Un solo host (strava.com); el pool cubre las descargas de páginas en paralelo
+    adapter = _KeepAliveAdapter(pool_connections=2, pool_maxsize=8, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def _parse_rate_limit_header(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parsea una cabecera de Strava con formato "15min,diario" """
+    try:
+        short_term, daily = value.split(',')
+        return int(short_term), int(daily)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _rate_limit_usage(headers) -> Optional[Tuple[float, float]]:
+    """
+    Fracción usada de los límites de Strava según las cabeceras de la respuesta
+    
+    Args:
+        headers: Cabeceras con X-RateLimit-Usage y X-RateLimit-Limit
+    
+    Returns:
+        Tupla (uso de la ventana de 15 minutos, uso diario), o None si faltan
+    """
+    usage = _parse_rate_limit_header(headers.get('X-RateLimit-Usage'))
+    limit = _parse_rate_limit_header(headers.get('X-RateLimit-Limit'))
+    if not usage or not limit or not all(limit):
+        return None
+    return usage[0] / limit[0], usage[1] / limit[1]
+
+
+def _seconds_until_rate_limit_reset() -> float:
+    """Segundos hasta que se reinicie la ventana de 15 minutos actual"""
+    return RATE_LIMIT_WINDOW_S - time.time() % RATE_LIMIT_WINDOW_S
+
+
+class TokenCache:
+    """Persiste los tokens OAuth en disco con permisos restringidos"""
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else TOKEN_CACHE_PATH
+    
+    def load(self) -> Optional[Dict]:
+        """Carga el token guardado, o None si no existe o está corrupto"""
+        try:
+            return _json_loads(self.path.read_bytes())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def save(self, token_data: Dict):
+        """
+        Guarda el token con permisos 0600 (solo lectura/escritura del usuario)
+        
+        La escritura es atómica (archivo temporal + os.replace): si el proceso
+        termina a mitad, en disco queda el token anterior completo y nunca un
+        archivo truncado.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # mkstemp crea el archivo temporal con permisos 0600
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_json_dumps(token_data))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
 
 class StravaAuth:
     """Maneja la autenticación OAuth con Strava"""
     
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        redirect_uri: str,
+        token_cache: Optional[TokenCache] = None
+    ):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
+        self.token_cache = token_cache or TokenCache()
+        self._session = _build_session()
+        self._refresh_lock = threading.Lock()
         self.access_token = None
         self.refresh_token = None
         self.expires_at = None
@@ -47,43 +201,93 @@ class StravaAuth:
             'grant_type': 'authorization_code'
         }
         
-        response = requests.post(token_url, data=payload)
+        response = self._session.post(token_url, data=payload)
         response.raise_for_status()
         
-        token_data = response.json()
+        token_data = _json_loads(response.content)
         self.access_token = token_data['access_token']
         self.refresh_token = token_data['refresh_token']
         self.expires_at = token_data['expires_at']
         
         return token_data
     
-    def save_token(self, filename: str = 'strava_token.json'):
-        """Guarda el token en un archivo"""
+    def save_token(self, filename: Optional[str] = None):
+        """Guarda el token en la caché (o en el archivo indicado)"""
         token_data = {
             'access_token': self.access_token,
             'refresh_token': self.refresh_token,
             'expires_at': self.expires_at
         }
-        with open(filename, 'w') as f:
-            json.dump(token_data, f)
+        cache = TokenCache(filename) if filename else self.token_cache
+        cache.save(token_data)
     
-    def load_token(self, filename: str = 'strava_token.json') -> bool:
-        """Carga el token desde un archivo"""
-        try:
-            with open(filename, 'r') as f:
-                token_data = json.load(f)
-                self.access_token = token_data['access_token']
-                self.refresh_token = token_data['refresh_token']
-                self.expires_at = token_data['expires_at']
-                return True
-        except FileNotFoundError:
+    def load_token(self, filename: Optional[str] = None) -> bool:
+        """Carga el token desde la caché (o desde el archivo indicado)"""
+        cache = TokenCache(filename) if filename else self.token_cache
+        token_data = cache.load()
+        
+        # Migrar el token del formato antiguo (strava_token.json en el directorio actual)
+        if token_data is None and filename is None:
+            token_data = TokenCache(LEGACY_TOKEN_FILE).load()
+            if token_data is not None:
+                self.token_cache.save(token_data)
+                # Borrar el archivo antiguo: tras el primer refresco su refresh token queda
+                # invalidado y volvería a migrarse si se borra la caché nueva
+                Path(LEGACY_TOKEN_FILE).unlink(missing_ok=True)
+                print(f"✓ Token migrado a {self.token_cache.path}")
+        
+        if token_data is None:
             return False
+        
+        self.access_token = token_data['access_token']
+        self.refresh_token = token_data['refresh_token']
+        self.expires_at = token_data['expires_at']
+        return True
     
-    def is_token_valid(self) -> bool:
-        """Verifica si el token actual es válido"""
+    def seconds_until_expiry(self) -> float:
+        """Segundos que le quedan al token actual (0 si no hay token)"""
         if not self.access_token or not self.expires_at:
+            return 0
+        return self.expires_at - time.time()
+    
+    def is_token_valid(self) -> bool:
+        """Verifica si el token actual es válido y no necesita refrescarse aún"""
+        return self.seconds_until_expiry() > SAFETY_WINDOW_S
+    
+    def is_token_usable(self) -> bool:
+        """Verifica si el token todavía puede usarse, aunque esté por expirar"""
+        return self.seconds_until_expiry() > TOKEN_EXPIRY_MARGIN_S
+    
+    def ensure_usable_token(self):
+        """Refresca el token en el momento si ya no puede usarse"""
+        with self._refresh_lock:
+            # Otro hilo pudo haberlo refrescado mientras se esperaba el lock
+            if not self.is_token_usable():
+                self.refresh_access_token()
+    
+    def refresh_in_background(self) -> bool:
+        """
+        Refresca el token en un hilo aparte si no hay otro refresco en curso
+        
+        Returns:
+            bool: True si se lanzó el refresco
+        """
+        if not self._refresh_lock.acquire(blocking=False):
             return False
-        return datetime.now().timestamp() < self.expires_at
+        
+        def _refresh():
+            try:
+                self.refresh_access_token()
+            except Exception as e:
+                # El siguiente request refrescará de forma síncrona si hace falta
+                print(f"\n⚠ Error refrescando el token en segundo plano: {e}")
+            finally:
+                self._refresh_lock.release()
+        
+        # Hilo no daemon: al salir de la aplicación se espera a que termine, para que
+        # los tokens nuevos (el refresh token anterior queda invalidado) lleguen a disco
+        threading.Thread(target=_refresh).start()
+        return True
     
     def refresh_access_token(self):
         """Refresca el token de acceso usando el refresh token"""
@@ -96,10 +300,11 @@ class StravaAuth:
             'grant_type': 'refresh_token'
         }
         
-        response = requests.post(token_url, data=payload)
+        # Con timeout: un refresco en segundo plano colgado no debe bloquear la salida
+        response = self._session.post(token_url, data=payload, timeout=TOKEN_REQUEST_TIMEOUT_S)
         response.raise_for_status()
         
-        token_data = response.json()
+        token_data = _json_loads(response.content)
         self.access_token = token_data['access_token']
         self.refresh_token = token_data['refresh_token']
         self.expires_at = token_data['expires_at']
@@ -107,148 +312,169 @@ class StravaAuth:
         self.save_token()
 
 
-class AuthCallbackHandler(BaseHTTPRequestHandler):
-    """Handler para capturar el callback de OAuth"""
-    
-    authorization_code = None
-    
-    def do_GET(self):
-        try:
-            print(f"\n📥 Solicitud recibida: {self.path}")
-            query_components = parse_qs(urlparse(self.path).query)
-            
-            if 'code' in query_components:
-                AuthCallbackHandler.authorization_code = query_components['code'][0]
-                
-                # Preparar respuesta HTML simple y corta
-                html_content = """<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Autenticacion Exitosa</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            height: 100vh;
-            margin: 0;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }
-        .container {
-            text-align: center;
-            padding: 40px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 10px;
-            backdrop-filter: blur(10px);
-        }
-        h1 { margin: 0 0 20px 0; font-size: 2.5em; }
-        p { font-size: 1.2em; margin: 10px 0; }
-        .checkmark { font-size: 4em; margin-bottom: 20px; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="checkmark">&#10003;</div>
-        <h1>Autenticacion Completada!</h1>
-        <p>Ya puedes cerrar esta ventana</p>
-        <p>Vuelve a la terminal para continuar</p>
-    </div>
-</body>
-</html>"""
-                
-                # Enviar respuesta HTTP correctamente formada
-                html_bytes = html_content.encode('utf-8')
-                self.send_response(200)
-                self.send_header('Content-Type', 'text/html; charset=utf-8')
-                self.send_header('Content-Length', str(len(html_bytes)))
-                self.send_header('Connection', 'close')
-                self.end_headers()
-                self.wfile.write(html_bytes)
-                
-                print("\n✓ Código de autorización recibido")
-            else:
-                # Error: no se recibió código
-                error_html = """<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Error</title>
-</head>
-<body>
-    <h1>Error: No se recibio el codigo de autorizacion</h1>
-    <p>Por favor, intenta de nuevo.</p>
-</body>
-</html>"""
-                error_bytes = error_html.encode('utf-8')
-                self.send_response(400)
-                self.send_header('Content-Type', 'text/html; charset=utf-8')
-                self.send_header('Content-Length', str(len(error_bytes)))
-                self.send_header('Connection', 'close')
-                self.end_headers()
-                self.wfile.write(error_bytes)
-        except Exception as e:
-            print(f"\n⚠ Error procesando callback: {e}")
-            try:
-                simple_error = b"Error procesando la solicitud"
-                self.send_response(500)
-                self.send_header('Content-Type', 'text/plain')
-                self.send_header('Content-Length', str(len(simple_error)))
-                self.send_header('Connection', 'close')
-                self.end_headers()
-                self.wfile.write(simple_error)
-            except:
-                pass
-    
-    def log_message(self, format, *args):
-        # Silenciar logs del servidor
-        pass
+def __getattr__(name: str):
+    """Compatibilidad con `from strava_client import AuthCallbackHandler` (PEP 562)"""
+    if name == "AuthCallbackHandler":
+        from auth_callback import AuthCallbackHandler
+        return AuthCallbackHandler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _read_activity_cache(path: Path) -> Optional[List[Dict]]:
+    """Lee actividades cacheadas, o None si no existen o el archivo está corrupto"""
+    try:
+        return _json_loads(path.read_bytes())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_activity_cache(path: Path, activities: List[Dict]):
+    """Escribe la caché de forma atómica (archivo temporal + os.replace)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_json_dumps(activities))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _prune_activity_cache(keep: Path):
+    """Borra las demás cachés del atleta (p. ej. de días anteriores) para que la carpeta no crezca"""
+    athlete_id = keep.name.split('_', 1)[0]
+    for path in keep.parent.glob(f"{athlete_id}_*.json"):
+        if path != keep:
+            path.unlink(missing_ok=True)
 
 
 class StravaClient:
     """Cliente para interactuar con la API de Strava"""
     
-    def __init__(self, auth: StravaAuth):
+    def __init__(self, auth: StravaAuth, cache_dir: Optional[Path] = None):
         self.auth = auth
         self.base_url = "https://www.strava.com/api/v3"
+        self.cache_dir = Path(cache_dir) if cache_dir else ACTIVITY_CACHE_DIR
+        self._athlete_id: Optional[int] = None
+        self._detail_cache: Dict[int, Tuple[str, Dict]] = {}
+        self._session = _build_session()
+        self._session_token: Optional[str] = None
+        self._throttle_until = 0.0
+        self._rate_limit_lock = threading.Lock()
+        self._daily_limit_warned = False
     
     def _ensure_valid_token(self):
         """Asegura que el token sea válido antes de hacer requests"""
         if not self.auth.is_token_valid():
-            self.auth.refresh_access_token()
-    
-    def _get_headers(self) -> Dict:
-        """Retorna los headers para las peticiones"""
-        return {'Authorization': f'Bearer {self.auth.access_token}'}
+            if self.auth.is_token_usable():
+                # Aún sirve: usarlo ahora y refrescarlo sin bloquear este request
+                self.auth.refresh_in_background()
+            else:
+                self.auth.ensure_usable_token()
+        
+        # Actualizar la cabecera de la sesión solo cuando cambia el token.
+        # Se lee una sola vez: el refresco en segundo plano puede cambiarlo entre lecturas
+        token = self.auth.access_token
+        if self._session_token != token:
+            self._session.headers.update({'Authorization': f'Bearer {token}'})
+            self._session_token = token
+            # Un token nuevo puede venir de otra autorización: volver a pedir el atleta
+            self._athlete_id = None
+    
+    def _wait_for_rate_limit(self):
+        """Espera si el uso de la ventana actual ya está cerca del límite"""
+        # Con el lock solo un hilo avisa y espera; los demás continúan al terminar
+        with self._rate_limit_lock:
+            delay = self._throttle_until - time.time()
+            if delay > 0:
+                print(f"⏳ Cerca del límite de peticiones de Strava, esperando {int(delay)} s...")
+                time.sleep(delay)
+    
+    def _record_rate_limit(self, response: requests.Response):
+        """Actualiza la espera pendiente según las cabeceras de uso de Strava"""
+        usage = _rate_limit_usage(response.headers)
+        if usage is None:
+            return
+        
+        short_term, daily = usage
+        if short_term >= RATE_LIMIT_THRESHOLD:
+            self._throttle_until = time.time() + _seconds_until_rate_limit_reset()
+        if daily >= RATE_LIMIT_THRESHOLD and not self._daily_limit_warned:
+            print(f"⚠️  Uso diario de la API de Strava al {daily:.0%}")
+            self._daily_limit_warned = True
+    
+    def _get(self, path: str, **kwargs) -> requests.Response:
+        """GET a la API de Strava respetando sus límites de uso"""
+        self._wait_for_rate_limit()
+        response = self._session.get(f"{self.base_url}{path}", **kwargs)
+        
+        if response.status_code == 429:
+            # La sesión ya agotó sus reintentos: esperar a que se reinicie la ventana
+            retry_after = response.headers.get('Retry-After', '')
+            delay = int(retry_after) if retry_after.isdecimal() else _seconds_until_rate_limit_reset()
+            print(f"⏳ Límite de peticiones de Strava alcanzado, esperando {int(delay)} s...")
+            time.sleep(delay)
+            response = self._session.get(f"{self.base_url}{path}", **kwargs)
+        
+        self._record_rate_limit(response)
+        return response
     
     def get_athlete(self) -> Dict:
         """Obtiene información del atleta"""
         self._ensure_valid_token()
-        response = requests.get(
-            f"{self.base_url}/athlete",
-            headers=self._get_headers()
-        )
+        response = self._get("/athlete")
         response.raise_for_status()
-        return response.json()
+        athlete = _json_loads(response.content)
+        self._athlete_id = athlete['id']
+        return athlete
+    
+    def _activities_cache_file(
+        self,
+        after: Optional[datetime],
+        before: Optional[datetime],
+        per_page: int
+    ) -> Path:
+        """
+        Ruta de la caché para un atleta, un rango de fechas (con granularidad de día)
+        y un tamaño de página
+        
+        per_page forma parte de la clave porque la descarga se corta a las
+        MAX_ACTIVITY_PAGES páginas: el número de actividades depende de él.
+        """
+        if self._athlete_id is None:
+            self.get_athlete()
+        
+        after_key = after.date().isoformat() if after else 'all'
+        name = f"{self._athlete_id}_{after_key}"
+        if before:
+            name += f"_{before.date().isoformat()}"
+        return self.cache_dir / f"{name}_p{per_page}.json"
     
     def get_activities(
         self, 
         after: Optional[datetime] = None,
         before: Optional[datetime] = None,
-        per_page: int = 30
+        per_page: int = 30,
+        use_cache: bool = True
     ) -> List[Dict]:
         """
         Obtiene actividades del atleta
         
+        Los resultados se guardan en disco y se reutilizan durante
+        ACTIVITY_CACHE_TTL_S; pasado ese tiempo se revalidan con If-Modified-Since.
+        
         Args:
             after: Fecha desde la cual obtener actividades
             before: Fecha hasta la cual obtener actividades
-            per_page: Número de actividades por página
+            per_page: Número de actividades por página (máximo STRAVA_MAX_PER_PAGE)
+            use_cache: Si debe usar la caché local de actividades
         """
         self._ensure_valid_token()
         
+        # Strava nunca devuelve más de STRAVA_MAX_PER_PAGE por página: sin recortar,
+        # una página llena se tomaría por la última
+        per_page = min(per_page, STRAVA_MAX_PER_PAGE)
         params = {'per_page': per_page}
         
         if after:
@@ -256,53 +482,111 @@ class StravaClient:
         if before:
             params['before'] = int(before.timestamp())
         
+        headers = {}
+        cache_file = None
+        cached = None
+        
+        if use_cache:
+            cache_file = self._activities_cache_file(after, before, per_page)
+            cached = _read_activity_cache(cache_file)
+            if cached is not None:
+                cache_mtime = cache_file.stat().st_mtime
+                if time.time() - cache_mtime < ACTIVITY_CACHE_TTL_S:
+                    return cached
+                headers['If-Modified-Since'] = formatdate(cache_mtime, usegmt=True)
+        
+        response = self._request_activity_page(params, 1, headers)
+        
+        # Sin cambios desde la última descarga: renovar la caché
+        if response.status_code == 304 and cached is not None:
+            cache_file.touch()
+            return cached
+        
+        response.raise_for_status()
+        activities = _json_loads(response.content)
+        
+        # Una página incompleta es la última; si viene llena, pedir el resto en paralelo
+        if len(activities) == per_page:
+            activities.extend(self._fetch_remaining_pages(params, per_page))
+        
+        if cache_file is not None:
+            _write_activity_cache(cache_file, activities)
+            _prune_activity_cache(cache_file)
+        
+        return activities
+    
+    def _request_activity_page(
+        self,
+        params: Dict,
+        page: int,
+        headers: Optional[Dict] = None
+    ) -> requests.Response:
+        """Pide una página del listado de actividades"""
+        return self._get(
+            "/athlete/activities",
+            headers=headers,
+            params={**params, 'page': page}
+        )
+    
+    def _get_activity_page(self, params: Dict, page: int) -> List[Dict]:
+        """Descarga y parsea una página del listado de actividades"""
+        response = self._request_activity_page(params, page)
+        response.raise_for_status()
+        return _json_loads(response.content)
+    
+    def _fetch_remaining_pages(self, params: Dict, per_page: int) -> List[Dict]:
+        """
+        Descarga las páginas 2..MAX_ACTIVITY_PAGES en paralelo
+        
+        Los resultados se recorren en orden de página y se detiene en la primera
+        página incompleta, cancelando las peticiones que aún no han empezado.
+        """
         activities = []
-        page = 1
-        
-        while True:
-            params['page'] = page
-            response = requests.get(
-                f"{self.base_url}/athlete/activities",
-                headers=self._get_headers(),
-                params=params
-            )
-            response.raise_for_status()
-            
-            page_activities = response.json()
-            if not page_activities:
-                break
-                
-            activities.extend(page_activities)
-            page += 1
-            
-            # Límite de seguridad
-            if page > 10:
-                break
+        
+        with ThreadPoolExecutor(max_workers=ACTIVITY_FETCH_WORKERS) as executor:
+            futures = [
+                executor.submit(self._get_activity_page, params, page)
+                for page in range(2, MAX_ACTIVITY_PAGES + 1)
+            ]
+            try:
+                for future in futures:
+                    page_activities = future.result()
+                    activities.extend(page_activities)
+                    if len(page_activities) < per_page:
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
         
         return activities
     
     def get_activity_details(self, activity_id: int) -> Dict:
         """Obtiene detalles completos de una actividad específica"""
         self._ensure_valid_token()
-        response = requests.get(
-            f"{self.base_url}/activities/{activity_id}",
-            headers=self._get_headers()
-        )
+        
+        # Petición condicional: si la actividad no cambió, Strava responde 304 sin cuerpo
+        cached = self._detail_cache.get(activity_id)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        response = self._get(f"/activities/{activity_id}", headers=headers)
+        if cached and response.status_code == 304:
+            return cached[1]
+        
         response.raise_for_status()
-        return response.json()
+        details = _json_loads(response.content)
+        etag = response.headers.get('ETag')
+        if etag:
+            self._detail_cache[activity_id] = (etag, details)
+        return details
     
     def get_activity_stats(self) -> Dict:
         """Obtiene estadísticas agregadas del atleta"""
         self._ensure_valid_token()
-        athlete = self.get_athlete()
-        athlete_id = athlete['id']
+        if self._athlete_id is None:
+            self.get_athlete()
         
-        response = requests.get(
-            f"{self.base_url}/athletes/{athlete_id}/stats",
-            headers=self._get_headers()
-        )
+        response = self._get(f"/athletes/{self._athlete_id}/stats")
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
 
 
 def authenticate_strava(client_id: str, client_secret: str, redirect_uri: str) -> StravaAuth:
@@ -316,7 +600,8 @@ def authenticate_strava(client_id: str, client_secret: str, redirect_uri: str) -
     
     # Intentar cargar token existente
     if auth.load_token():
-        if auth.is_token_valid():
+        # Si está por expirar, StravaClient lo refrescará en segundo plano
+        if auth.is_token_usable():
             print("✓ Token cargado exitosamente")
             return auth
         else:
@@ -340,6 +625,7 @@ def authenticate_strava(client_id: str, client_secret: str, redirect_uri: str) -
     
     # Intentar abrir navegador automáticamente (puede fallar en WSL)
     try:
+        import webbrowser  # Solo se necesita en el flujo interactivo
         webbrowser.open(auth_url)
         print("\n✓ Se intentó abrir el navegador automáticamente")
     except Exception as e:
@@ -379,7 +665,7 @@ def authenticate_strava(client_id: str, client_secret: str, redirect_uri: str) -
     print("\n" + "=" * 70)
     print("✅ AUTENTICACIÓN COMPLETADA EXITOSAMENTE")
     print("=" * 70)
-    print("✓ Token guardado en strava_token.json")
+    print(f"✓ Token guardado en {auth.token_cache.path}")
     print("✓ Ya puedes usar el agente de coach\n")
     return auth
 
@@ -391,9 +677,8 @@ def meters_to_km(meters: float) -> float:
 
 def seconds_to_time(seconds: int) -> str:
     """Convierte segundos a formato HH:MM:SS"""
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
     
     if hours > 0:
         return f"{hours}h {minutes:02d}m {secs:02d}s"
@@ -414,7 +699,6 @@ def calculate_pace(distance_meters: float, time_seconds: int) -> str:
     km = meters_to_km(distance_meters)
     pace_seconds = time_seconds / km
     
-    minutes = int(pace_seconds // 60)
-    seconds = int(pace_seconds % 60)
+    minutes, seconds = divmod(int(pace_seconds), 60)
     
     return f"{minutes}:{seconds:02d} /km"
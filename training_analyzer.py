@@ -2,17 +2,86 @@
 Módulo para analizar datos de entrenamiento y generar insights
 """
 
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime
 from typing import List, Dict, Optional
+import functools
+import heapq
 import statistics
 
 
+def _new_bucket() -> Dict:
+    """Bucket semanal vacío"""
+    return {
+        'week_ordinal': None,
+        'runs': 0,
+        'distance_km': 0,
+        'time_hours': 0,
+        'elevation_m': 0
+    }
+
+
+def _fresh_copy(value):
+    """Copia listas y dicts anidados (los valores escalares son inmutables y se comparten)"""
+    if isinstance(value, dict):
+        return {key: _fresh_copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fresh_copy(item) for item in value]
+    return value
+
+
+def _memoized(method):
+    """
+    Cachea por instancia el resultado de un método, según sus argumentos.
+    
+    Las actividades no cambian tras construir el analizador, así que cada
+    métrica se calcula una sola vez; para recargar datos se crea un analizador nuevo.
+    Cada llamada recibe una copia de las listas y dicts cacheados: modificar un
+    resultado no altera las llamadas siguientes ni el contexto del coach.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            result = self._cache[key]
+        except KeyError:
+            result = self._cache[key] = method(self, *args, **kwargs)
+        return _fresh_copy(result)
+    return wrapper
+
+
 class TrainingAnalyzer:
     """Analiza datos de entrenamiento y genera métricas"""
     
     def __init__(self, activities: List[Dict]):
         self.activities = activities
         self.running_activities = self._filter_running_activities()
+        self._cache: Dict[tuple, object] = {}
+        
+        # Huella del conjunto de actividades: permite detectar datos sin cambios
+        self.fingerprint = hash(tuple(
+            (a.get('id'), a.get('distance'), a.get('moving_time'), a.get('name'))
+            for a in self.running_activities
+        ))
+        
+        # Columnas precalculadas (una lista por métrica; las fechas se parsean
+        # una sola vez) para evitar recorrer y parsear las actividades en cada método
+        self._distances = [a['distance'] for a in self.running_activities]
+        self._moving_times = [a['moving_time'] for a in self.running_activities]
+        self._elevations = [a.get('total_elevation_gain', 0) for a in self.running_activities]
+        self._start_dates = [
+            datetime.fromisoformat(a['start_date'].replace('Z', '+00:00'))
+            for a in self.running_activities
+        ]
+        self._start_ts = [start_date.timestamp() for start_date in self._start_dates]
+        
+        # Conversiones derivadas, también calculadas una sola vez
+        self._km = [distance / 1000 for distance in self._distances]
+        self._hours = [moving_time / 3600 for moving_time in self._moving_times]
+        self._paces = [
+            moving_time / km if distance > 0 else 0
+            for distance, km, moving_time in zip(self._distances, self._km, self._moving_times)
+        ]
     
     def _filter_running_activities(self) -> List[Dict]:
         """Filtra solo las actividades de running"""
@@ -21,6 +90,7 @@ class TrainingAnalyzer:
             if activity.get('type') in ['Run', 'VirtualRun', 'TrailRun']
         ]
     
+    @_memoized
     def get_summary_stats(self) -> Dict:
         """Genera estadísticas resumidas del periodo"""
         if not self.running_activities:
@@ -33,9 +103,9 @@ class TrainingAnalyzer:
                 'total_elevation_gain_m': 0
             }
         
-        total_distance = sum(a['distance'] for a in self.running_activities)
-        total_time = sum(a['moving_time'] for a in self.running_activities)
-        total_elevation = sum(a.get('total_elevation_gain', 0) for a in self.running_activities)
+        total_distance = sum(self._distances)
+        total_time = sum(self._moving_times)
+        total_elevation = sum(self._elevations)
         
         avg_distance = total_distance / len(self.running_activities)
         avg_pace_seconds = total_time / (total_distance / 1000) if total_distance > 0 else 0
@@ -49,51 +119,65 @@ class TrainingAnalyzer:
             'total_elevation_gain_m': round(total_elevation, 0)
         }
     
-    def get_weekly_mileage(self) -> List[Dict]:
-        """Agrupa actividades por semana y calcula kilometraje"""
-        weekly_data = {}
+    @_memoized
+    def _weekly_buckets(self) -> List[Dict]:
+        """Agrupa actividades por semana (totales sin redondear, en orden de aparición)"""
+        weekly_data = defaultdict(_new_bucket)
         
-        for activity in self.running_activities:
-            # Parsear fecha de la actividad
-            start_date = datetime.fromisoformat(activity['start_date'].replace('Z', '+00:00'))
-            
-            # Obtener el lunes de esa semana
-            week_start = start_date - timedelta(days=start_date.weekday())
-            week_key = week_start.strftime('%Y-%W')
+        columns = zip(self._start_dates, self._km, self._hours, self._elevations)
+        for start_date, km, hours, elevation in columns:
+            # Clave entera: ordinal del lunes de esa semana
+            week_key = start_date.toordinal() - start_date.weekday()
             
-            if week_key not in weekly_data:
-                weekly_data[week_key] = {
-                    'week_start': week_start.strftime('%Y-%m-%d'),
-                    'runs': 0,
-                    'distance_km': 0,
-                    'time_hours': 0,
-                    'elevation_m': 0
-                }
-            
-            weekly_data[week_key]['runs'] += 1
-            weekly_data[week_key]['distance_km'] += activity['distance'] / 1000
-            weekly_data[week_key]['time_hours'] += activity['moving_time'] / 3600
-            weekly_data[week_key]['elevation_m'] += activity.get('total_elevation_gain', 0)
-        
-        # Convertir a lista ordenada por fecha
-        weekly_list = sorted(
-            weekly_data.values(), 
-            key=lambda x: x['week_start'],
-            reverse=True
-        )
+            # Una sola búsqueda del bucket por actividad (se crea si no existe)
+            bucket = weekly_data[week_key]
+            if bucket['week_ordinal'] is None:
+                bucket['week_ordinal'] = week_key
+            bucket['runs'] += 1
+            bucket['distance_km'] += km
+            bucket['time_hours'] += hours
+            bucket['elevation_m'] += elevation
+        
+        return list(weekly_data.values())
+    
+    @_memoized
+    def get_weekly_mileage(self, top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Agrupa actividades por semana y calcula kilometraje
         
-        # Redondear valores
-        for week in weekly_list:
-            week['distance_km'] = round(week['distance_km'], 2)
-            week['time_hours'] = round(week['time_hours'], 2)
-            week['elevation_m'] = round(week['elevation_m'], 0)
+        Args:
+            top_k: Si se indica, solo devuelve las top_k semanas más recientes
         
-        return weekly_list
+        Returns:
+            Semanas ordenadas de la más reciente a la más antigua
+        """
+        buckets = self._weekly_buckets()
+        
+        # Ordenar por fecha; para pocas semanas basta un heap en vez de ordenar todas
+        if top_k is None:
+            weeks = sorted(buckets, key=lambda x: x['week_ordinal'], reverse=True)
+        else:
+            weeks = heapq.nlargest(top_k, buckets, key=lambda x: x['week_ordinal'])
+        
+        # Formatear la fecha y redondear valores solo para las semanas devueltas
+        return [
+            {
+                'week_start': date.fromordinal(week['week_ordinal']).isoformat(),
+                'runs': week['runs'],
+                'distance_km': round(week['distance_km'], 2),
+                'time_hours': round(week['time_hours'], 2),
+                'elevation_m': round(week['elevation_m'], 0)
+            }
+            for week in weeks
+        ]
     
+    @_memoized
     def analyze_training_load(self) -> Dict:
         """Analiza la carga de entrenamiento y tendencias"""
-        weekly_mileage = self.get_weekly_mileage()
-        
+        return self._assess_load(self.get_weekly_mileage(top_k=2))
+    
+    def _assess_load(self, weekly_mileage: List[Dict]) -> Dict:
+        """Evalúa la progresión de carga a partir del kilometraje semanal ya calculado"""
         if len(weekly_mileage) < 2:
             return {
                 'trend': 'insuficiente_data',
@@ -138,24 +222,26 @@ class TrainingAnalyzer:
             'recommendation': recommendation
         }
     
+    @_memoized
     def get_pace_distribution(self) -> Dict:
         """Analiza distribución de paces para identificar zonas de entrenamiento"""
         if not self.running_activities:
             return {}
         
-        paces = []
-        for activity in self.running_activities:
-            if activity['distance'] > 1000:  # Solo considerar carreras > 1km
-                pace_seconds = activity['moving_time'] / (activity['distance'] / 1000)
-                paces.append(pace_seconds)
+        # Solo considerar carreras > 1km (ordenadas: mínimo, máximo y mediana salen de una sola ordenación)
+        paces = sorted(
+            pace
+            for distance, pace in zip(self._distances, self._paces)
+            if distance > 1000
+        )
         
         if not paces:
             return {}
         
-        avg_pace = statistics.mean(paces)
+        avg_pace = statistics.fmean(paces)
         median_pace = statistics.median(paces)
-        fastest_pace = min(paces)
-        slowest_pace = max(paces)
+        fastest_pace = paces[0]
+        slowest_pace = paces[-1]
         
         return {
             'avg_pace': self._format_pace(avg_pace),
@@ -165,20 +251,19 @@ class TrainingAnalyzer:
             'pace_variability': round(statistics.stdev(paces) if len(paces) > 1 else 0, 2)
         }
     
+    @_memoized
     def get_recent_activities_summary(self, limit: int = 5) -> List[Dict]:
         """Obtiene resumen de las últimas actividades"""
-        recent = self.running_activities[:limit]
+        recent = zip(self.running_activities[:limit], self._km, self._paces)
         
         summaries = []
-        for activity in recent:
-            date = datetime.fromisoformat(activity['start_date'].replace('Z', '+00:00'))
-            distance_km = activity['distance'] / 1000
+        for activity, distance_km, pace in recent:
             time_minutes = activity['moving_time'] / 60
-            pace = activity['moving_time'] / (activity['distance'] / 1000) if activity['distance'] > 0 else 0
             
             summaries.append({
                 'name': activity['name'],
-                'date': date.strftime('%Y-%m-%d'),
+                # start_date es ISO-8601 ('YYYY-MM-DDTHH:MM:SSZ'): la fecha son los 10 primeros caracteres
+                'date': activity['start_date'][:10],
                 'distance_km': round(distance_km, 2),
                 'time_minutes': round(time_minutes, 1),
                 'pace': self._format_pace(pace),
@@ -189,28 +274,28 @@ class TrainingAnalyzer:
         
         return summaries
     
+    @_memoized
     def detect_potential_issues(self) -> List[str]:
         """Detecta posibles problemas o riesgos en el entrenamiento"""
+        return self._find_issues(self.get_weekly_mileage(top_k=3), self.analyze_training_load())
+    
+    def _find_issues(self, weekly_mileage: List[Dict], load_analysis: Dict) -> List[str]:
+        """Detecta problemas a partir del kilometraje semanal y el análisis de carga ya calculados"""
         issues = []
         
         # Verificar progresión de carga
-        load_analysis = self.analyze_training_load()
         if not load_analysis['is_safe_progression'] and load_analysis['load_change_percent'] > 10:
             issues.append(f"Incremento rápido de volumen ({load_analysis['load_change_percent']:.1f}%)")
         
         # Verificar consistencia
-        weekly_mileage = self.get_weekly_mileage()
         if len(weekly_mileage) >= 3:
             distances = [w['distance_km'] for w in weekly_mileage[:3]]
-            if statistics.stdev(distances) > statistics.mean(distances) * 0.5:
+            if statistics.stdev(distances) > statistics.fmean(distances) * 0.5:
                 issues.append("Alta variabilidad en el kilometraje semanal")
         
         # Verificar frecuencia
         if len(self.running_activities) > 0:
-            days_span = (
-                datetime.fromisoformat(self.running_activities[0]['start_date'].replace('Z', '+00:00')) -
-                datetime.fromisoformat(self.running_activities[-1]['start_date'].replace('Z', '+00:00'))
-            ).days
+            days_span = int((self._start_ts[0] - self._start_ts[-1]) // 86400)
             
             if days_span > 7:
                 runs_per_week = len(self.running_activities) / (days_span / 7)
@@ -219,25 +304,41 @@ class TrainingAnalyzer:
         
         return issues if issues else ["No se detectaron problemas significativos"]
     
+    @_memoized
+    def get_training_report(self) -> Dict:
+        """
+        Calcula todas las métricas del periodo de una vez
+        
+        Cada métrica está cacheada, así que el kilometraje semanal se calcula
+        una sola vez y se reutiliza para el análisis de carga y los problemas.
+        """
+        return {
+            'summary': self.get_summary_stats(),
+            'weekly': self.get_weekly_mileage(),
+            'load': self.analyze_training_load(),
+            'pace_distribution': self.get_pace_distribution(),
+            'issues': self.detect_potential_issues()
+        }
+    
     @staticmethod
     def _format_pace(pace_seconds: float) -> str:
         """Formatea pace de segundos a MM:SS /km"""
-        if pace_seconds == 0:
+        if not pace_seconds:
             return "N/A"
-        minutes = int(pace_seconds // 60)
-        seconds = int(pace_seconds % 60)
+        minutes, seconds = divmod(int(pace_seconds), 60)
         return f"{minutes}:{seconds:02d} /km"
     
+    @_memoized
     def generate_training_context(self) -> str:
         """Genera un contexto completo para el agente coach"""
         summary = self.get_summary_stats()
-        weekly = self.get_weekly_mileage()
+        weekly = self.get_weekly_mileage(top_k=4)
         load = self.analyze_training_load()
         pace_dist = self.get_pace_distribution()
         recent = self.get_recent_activities_summary()
         issues = self.detect_potential_issues()
         
-        context = f"""
+        parts = [f"""
 ## DATOS DEL ATLETA
 
 ### Resumen General (últimas {summary['total_runs']} carreras)
@@ -249,31 +350,31 @@ class TrainingAnalyzer:
 - Desnivel acumulado: {summary['total_elevation_gain_m']} m
 
 ### Kilometraje Semanal
-"""
-        for i, week in enumerate(weekly[:4], 1):
-            context += f"Semana {i} ({week['week_start']}): {week['distance_km']} km en {week['runs']} carreras\n"
+"""]
+        for i, week in enumerate(weekly, 1):
+            parts.append(f"Semana {i} ({week['week_start']}): {week['distance_km']} km en {week['runs']} carreras\n")
         
-        context += f"""
+        parts.append(f"""
 ### Análisis de Carga
 - Tendencia: {load['trend']}
 - Cambio de volumen: {load['load_change_percent']}%
 - {load['recommendation']}
 
 ### Distribución de Paces
-"""
+""")
         if pace_dist:
-            context += f"""- Pace promedio: {pace_dist['avg_pace']}
+            parts.append(f"""- Pace promedio: {pace_dist['avg_pace']}
 - Pace más rápido: {pace_dist['fastest_pace']}
 - Pace más lento: {pace_dist['slowest_pace']}
-"""
+""")
         
-        context += "\n### Últimas 5 Actividades\n"
+        parts.append("\n### Últimas 5 Actividades\n")
         for act in recent:
             hr_info = f", FC: {act['avg_heartrate']}-{act['max_heartrate']} bpm" if act['avg_heartrate'] else ""
-            context += f"- {act['date']}: {act['name']} - {act['distance_km']} km en {act['time_minutes']} min ({act['pace']}){hr_info}\n"
+            parts.append(f"- {act['date']}: {act['name']} - {act['distance_km']} km en {act['time_minutes']} min ({act['pace']}){hr_info}\n")
         
-        context += f"\n### Posibles Problemas Detectados\n"
+        parts.append("\n### Posibles Problemas Detectados\n")
         for issue in issues:
-            context += f"- {issue}\n"
+            parts.append(f"- {issue}\n")
         
-        return context
+        return "".join(parts)